@@ -13,16 +13,19 @@ Frontend consumers (e.g., SvelteKit app) can:
   - Download full datasets as CSV (/download.csv)
 """
 
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from datetime import date as dt_date
 import pandas as pd
-from io import StringIO
 
 from etl.ingest import fetch
 from etl.transform import transform, summary_stats
-from etl.load import save, read_all
+from etl.load import save, read_filtered, read_page, aggregate_mean_by_region, iter_csv
 
 # Configure logging
 logging.basicConfig(
@@ -32,9 +35,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Disease ETL API")
+# Default to orjson for response encoding; /data returns ORJSONResponse itself
+# so its large record lists also skip FastAPI's jsonable_encoder pass
+app = FastAPI(title="Disease ETL API", default_response_class=ORJSONResponse)
+
+# Dedicated pool for FluView requests so an all-states ETL run doesn't
+# occupy the threadpool that serves the other endpoints
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16)
 
 STATES = ['AL','AK','AZ','AR','CA','CO','CT','DE','DC','FL','GA','HI','ID','IL','IN','IA','KS','KY','LA','ME','MD','MA','MI','MN','MS','MO','MT','NE','NV','NH','NJ','NM','NY','NC','ND','OH','OK','OR','PA','RI','SC','SD','TN','TX','UT','VT','VA','WA','WV','WI','WY']
+STATES_LOWER = tuple(s.lower() for s in STATES)
 
 def _date_to_epiweek(d: dt_date) -> int:
     """
@@ -43,7 +53,22 @@ def _date_to_epiweek(d: dt_date) -> int:
     Example: 2025-01-07 → 202501
     """
     y, w, _ = d.isocalendar()
-    return int(f"{y:04d}{w:02d}")
+    return y * 100 + w
+
+def _epi_bounds(start_date: str | None, end_date: str | None) -> tuple[int | None, int | None]:
+    """
+    Convert optional YYYY-MM-DD query params into inclusive epiweek bounds.
+    """
+    epi_min = _date_to_epiweek(dt_date.fromisoformat(start_date)) if start_date else None
+    epi_max = _date_to_epiweek(dt_date.fromisoformat(end_date)) if end_date else None
+    return epi_min, epi_max
+
+def _filters(region: str | None, start_date: str | None, end_date: str | None) -> tuple[str | None, int | None, int | None]:
+    """
+    Normalize the shared read filters once at the request boundary:
+    region to the stored uppercase code, dates to inclusive epiweek bounds.
+    """
+    return (region.upper() if region else None, *_epi_bounds(start_date, end_date))
 
 def _epiweek_to_monday(epi: int) -> str:
     """
@@ -51,11 +76,11 @@ def _epiweek_to_monday(epi: int) -> str:
     Used for visual labels and time range summaries.
     Example: 202501 → '2024-12-30'
     """
-    s = str(int(epi)); y, w = int(s[:4]), int(s[4:6])
-    return pd.Timestamp(dt_date.fromisocalendar(y, w, 1)).strftime("%Y-%m-%d")
+    epi = int(epi)
+    return dt_date.fromisocalendar(epi // 100, epi % 100, 1).isoformat()
 
 @app.post("/etl/run")
-def run_etl(
+async def run_etl(
     region: str = "ma",
     start_date: str | None = Query(None, description="YYYY-MM-DD"),
     end_date: str | None = Query(None, description="YYYY-MM-DD"),
@@ -65,9 +90,9 @@ def run_etl(
 
     Steps:
     1. Convert the start and end dates into epiweek format.
-    2. Fetch raw ILI data for the selected regions from the Delphi API.
+    2. Fetch raw ILI data for the selected regions from the Delphi API (concurrently).
     3. Transform and normalize the results into tabular structure.
-    4. Save all rows into SQLite (UPSERT behavior on source_id).
+    4. Save all rows into SQLite in one batch (UPSERT behavior on source_id).
     5. Return a summary (rows loaded, first/last epiweek covered).
 
     Supports:
@@ -86,24 +111,28 @@ def run_etl(
             epi = f"{_date_to_epiweek(sd)}-{_date_to_epiweek(ed)}"
             logger.info(f"Date range converted to epiweek range: {epi}")
 
-        regions = STATES if region.lower() in ("all", "*") else [region.upper()]
+        if region.lower() in ("all", "*"):
+            regions, regions_lower = STATES, STATES_LOWER
+        else:
+            regions, regions_lower = [region.upper()], [region.lower()]
         logger.info(f"Processing {len(regions)} region(s)")
         
         all_dfs = []
         total_rows = 0
 
-        for r in regions:
-            logger.info(f"Fetching data for region: {r}")
-            raw = fetch(r.lower(), epiweeks=epi)
-            
-            df = transform(raw)
+        # Fetches are network-bound, so overlap them; gather keeps region order
+        loop = asyncio.get_running_loop()
+        raws = await asyncio.gather(*(
+            loop.run_in_executor(_FETCH_POOL, partial(fetch, r, epiweeks=epi))
+            for r in regions_lower
+        ))
+
+        for r, raw in zip(regions, raws):
+            df = await run_in_threadpool(transform, raw)
             if not df.empty:
                 rows_count = len(df)
                 total_rows += int(rows_count)
                 logger.info(f"Transformed {rows_count} rows for {r}")
-                
-                save(df)
-                logger.info(f"Saved {rows_count} rows for {r} to database")
                 all_dfs.append(df)
             else:
                 logger.warning(f"No data returned for region: {r}")
@@ -112,7 +141,11 @@ def run_etl(
             logger.warning("ETL completed with no data loaded")
             return {"rows_loaded": 0, "first_week": None, "last_week": None}
 
+        # One bulk upsert for all regions
         big = pd.concat(all_dfs, ignore_index=True)
+        await run_in_threadpool(save, big, return_count=False)
+        logger.info(f"Saved {total_rows} rows to database")
+
         first_epi = int(big["epiweek"].min())
         last_epi  = int(big["epiweek"].max())
         
@@ -130,27 +163,15 @@ def run_etl(
         return JSONResponse(status_code=400, content={"error": str(e)})
 
 @app.get("/stats")
-def get_stats(region: str | None = None, start_date: str | None = None, end_date: str | None = None):
+async def get_stats(region: str | None = None, start_date: str | None = None, end_date: str | None = None):
     logger.info(f"Stats request - region: {region}, start_date: {start_date}, end_date: {end_date}")
     
     try:
-        df = read_all()
-        initial_count = len(df)
-        logger.debug(f"Read {initial_count} total rows from database")
+        region_u, epi_min, epi_max = _filters(region, start_date, end_date)
+        df = await run_in_threadpool(read_filtered, region_u, epi_min, epi_max)
+        logger.debug(f"Read {len(df)} matching rows from database")
         
-        if region: 
-            df = df[df["region"] == region.upper()]
-            logger.debug(f"Filtered to region {region}: {len(df)} rows")
-            
-        if start_date: 
-            df = df[df["epiweek"] >= _date_to_epiweek(dt_date.fromisoformat(start_date))]
-            logger.debug(f"Filtered by start_date: {len(df)} rows remain")
-            
-        if end_date:   
-            df = df[df["epiweek"] <= _date_to_epiweek(dt_date.fromisoformat(end_date))]
-            logger.debug(f"Filtered by end_date: {len(df)} rows remain")
-        
-        stats = summary_stats(df)
+        stats = await run_in_threadpool(summary_stats, df)
         logger.info(f"Returning stats for {len(df)} rows")
         return stats
         
@@ -159,7 +180,7 @@ def get_stats(region: str | None = None, start_date: str | None = None, end_date
         raise
 
 @app.get("/data")
-def get_data(
+async def get_data(
     limit: int = 50,
     offset: int = 0,
     region: str | None = None,
@@ -182,24 +203,18 @@ def get_data(
                 f"start_date: {start_date}, end_date: {end_date}")
     
     try:
-        df = read_all()
-        if region: df = df[df["region"] == region.upper()]
-        if start_date: df = df[df["epiweek"] >= _date_to_epiweek(dt_date.fromisoformat(start_date))]
-        if end_date:   df = df[df["epiweek"] <= _date_to_epiweek(dt_date.fromisoformat(end_date))]
-        
-        total = int(len(df))
-        page = df.sort_values("date").iloc[offset:offset+limit].copy()
-        page["date"] = pd.to_datetime(page["date"]).dt.strftime("%Y-%m-%d")
+        region_u, epi_min, epi_max = _filters(region, start_date, end_date)
+        total, page = await run_in_threadpool(read_page, region_u, epi_min, epi_max, limit, offset)
         
         logger.info(f"Returning {len(page)} rows out of {total} total")
-        return {"total": total, "rows": page.to_dict(orient="records")}
+        return ORJSONResponse({"total": total, "rows": page.to_dict(orient="records")})
         
     except Exception as e:
         logger.error(f"Error retrieving data: {str(e)}", exc_info=True)
         raise
 
 @app.get("/map")
-def map_data(start_date: str, end_date: str, metric: str = "ili"):
+async def map_data(start_date: str, end_date: str, metric: str = "ili"):
     """
     Aggregate mean ILI (%) values for all states within a date range.
 
@@ -212,17 +227,9 @@ def map_data(start_date: str, end_date: str, metric: str = "ili"):
     logger.info(f"Map data request - start_date: {start_date}, end_date: {end_date}, metric: {metric}")
     
     try:
-        df = read_all()
-        sd = _date_to_epiweek(dt_date.fromisoformat(start_date))
-        ed = _date_to_epiweek(dt_date.fromisoformat(end_date))
-        df = df[(df["metric"] == metric) & (df["epiweek"] >= sd) & (df["epiweek"] <= ed)]
-        
-        if df.empty:
-            logger.warning(f"No data found for map with given parameters")
-            return {}
-        
-        gp = df.groupby("region")["value"].mean().round(6)
-        result_dict = gp.to_dict()
+        sd, ed = _epi_bounds(start_date, end_date)
+        means = await run_in_threadpool(aggregate_mean_by_region, metric, sd, ed)
+        result_dict = {r: round(v, 6) for r, v in means.items() if v is not None}
         
         logger.info(f"Returning map data for {len(result_dict)} regions")
         return result_dict
@@ -242,19 +249,12 @@ def download_csv(region: str | None = None, start_date: str | None = None, end_d
     logger.info(f"CSV download request - region: {region}, start_date: {start_date}, end_date: {end_date}")
     
     try:
-        df = read_all()
-        if region: df = df[df["region"] == region.upper()]
-        if start_date: df = df[df["epiweek"] >= _date_to_epiweek(dt_date.fromisoformat(start_date))]
-        if end_date:   df = df[df["epiweek"] <= _date_to_epiweek(dt_date.fromisoformat(end_date))]
-        
-        logger.info(f"Generating CSV with {len(df)} rows")
-        
-        csv_buf = StringIO()
-        df.sort_values(["region","date"]).to_csv(csv_buf, index=False)
-        csv_buf.seek(0)
+        region_u, epi_min, epi_max = _filters(region, start_date, end_date)
+        # Runs the query now, so DB errors land in the except below
+        rows = iter_csv(region_u, epi_min, epi_max)
         
         logger.info("CSV download started")
-        return StreamingResponse(csv_buf, media_type="text/csv",
+        return StreamingResponse(rows, media_type="text/csv",
             headers={"Content-Disposition": 'attachment; filename="cleaned.csv"'})
             
     except Exception as e:
@@ -1,6 +1,8 @@
 # etl/ingest.py
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 # Load the .env file once
@@ -9,6 +11,13 @@ load_dotenv()
 BASE = "https://api.delphi.cmu.edu/epidata/fluview/"
 API_KEY = os.getenv("DELPHI_API_KEY")
 
+# Shared keep-alive session so concurrent per-state fetches reuse connections
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)),
+)
+
 def fetch(region: str, epiweeks: str | None = None) -> list[dict]:
     """
     Fetch FluView data for a given state and epiweek range.
@@ -35,7 +44,7 @@ def fetch(region: str, epiweeks: str | None = None) -> list[dict]:
         "api_key": API_KEY, 
     }
 
-    r = requests.get(BASE, params=params, timeout=30)
+    r = _session.get(BASE, params=params, timeout=30)
     r.raise_for_status()
     data = r.json()
 
@@ -11,23 +11,119 @@ Design notes:
 - `source_id` is a stable primary key: "<state-lower>-<YYYYWW>" so re-running ETL
   for the same window will upsert (idempotent).
 - We keep a tiny migration/backfill for 'epiweek' to support older rows.
+- Schema setup and writes share one long-lived autocommit connection guarded
+  by a lock (`_conn()` / `_LOCK`); `save()` opens its own BEGIN/COMMIT.
+- Reads use a per-thread read-only connection (`_read_conn()`), so concurrent
+  requests on the threadpool query in parallel; WAL keeps them off the writer.
 """
 
+import csv
 import sqlite3
+import threading
+import weakref
+from io import StringIO
 from pathlib import Path
+from typing import Iterator
 import pandas as pd
 from datetime import date as dt_date
 
 DATA_PATH = Path("data/disease.db")
 TABLE = "observations"
+COLUMNS = ["date", "region", "value", "metric", "source_id", "epiweek"]
+
+# Set once _ensure_db() has run against DATA_PATH in this process
+_INITIALIZED = False
+
+# Shared connection (opened lazily for DATA_PATH) and the lock serializing its use
+_CONN = None
+_CONN_PATH = None
+_LOCK = threading.RLock()
+
+# Per-thread read connections; bumping _GENERATION makes threads reopen theirs.
+# _READ_CONNS only holds the open ones: each is closed and dropped when its
+# thread exits (threadpool workers are retired after idling) or it is replaced.
+_local = threading.local()
+_READ_CONNS = set()
+_GENERATION = 0
+
+class _Reader:
+    """Thread-local holder; its finalizer closes the connection with the thread."""
+    def __init__(self, conn: sqlite3.Connection, key: tuple):
+        self.conn, self.key = conn, key
+
+def _close_reader(conn: sqlite3.Connection):
+    with _LOCK:
+        _READ_CONNS.discard(conn)
+    conn.close()
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    """
+    Per-connection settings for bulk upserts: WAL's NORMAL sync only fsyncs at
+    checkpoints, temp B-trees stay in memory and the page cache is ~64 MB.
+    (journal_mode=WAL itself is persistent and set once in `_ensure_db`.)
+    """
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+
+def _apply_read_pragmas(conn: sqlite3.Connection):
+    """
+    Settings for the per-thread read connections: read-only, in-memory temp
+    B-trees for ORDER BY/GROUP BY, and a modest ~8 MB page cache (there is
+    one of these per worker thread).
+    """
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8192")
+
+def _conn() -> sqlite3.Connection:
+    """
+    Return the shared connection, (re)opening it if DATA_PATH has changed.
+    Callers must hold `_LOCK` while using it.
+    """
+    global _CONN, _CONN_PATH
+    if _CONN is None or _CONN_PATH != DATA_PATH:
+        if _CONN is not None:
+            _CONN.close()
+        DATA_PATH.parent.mkdir(exist_ok=True, parents=True)
+        _CONN = sqlite3.connect(DATA_PATH, check_same_thread=False, isolation_level=None)
+        _CONN.create_function("iso_monday", 1, _iso_monday_or_none, deterministic=True)
+        _apply_pragmas(_CONN)
+        _CONN_PATH = DATA_PATH
+    return _CONN
+
+def _read_conn() -> sqlite3.Connection:
+    """
+    Return this thread's read-only connection, (re)opening it if DATA_PATH
+    changed or `reset_db_init` ran since it was opened. No lock needed.
+    """
+    key = (DATA_PATH, _GENERATION)
+    reader = getattr(_local, "reader", None)
+    if reader is None or reader.key != key:
+        conn = sqlite3.connect(DATA_PATH, check_same_thread=False, isolation_level=None)
+        _apply_read_pragmas(conn)
+        with _LOCK:
+            _READ_CONNS.add(conn)
+        reader = _Reader(conn, key)
+        weakref.finalize(reader, _close_reader, conn)
+        # Replacing a stale holder finalizes (closes) its connection
+        _local.reader = reader
+    return reader.conn
 
 def _ensure_db():
     """
     Create the SQLite DB and table if they don't exist.
     Also perform a lightweight migration to make sure the 'epiweek' column exists.
+
+    Runs once per process; later calls return immediately (see `reset_db_init`).
     """
-    DATA_PATH.parent.mkdir(exist_ok=True, parents=True)
-    with sqlite3.connect(DATA_PATH) as conn:
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+    with _LOCK:
+        if _INITIALIZED:
+            return
+        conn = _conn()
         conn.execute(f"""
         CREATE TABLE IF NOT EXISTS {TABLE} (
             date TEXT,
@@ -38,52 +134,78 @@ def _ensure_db():
             epiweek INTEGER
         );
         """)
+        conn.execute("PRAGMA journal_mode=WAL")
         # use a cursor to fetch pragma results
         cur = conn.execute(f"PRAGMA table_info({TABLE})")
         cols = {row[1] for row in cur.fetchall()}
         if "epiweek" not in cols:
             conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN epiweek INTEGER")
-        conn.commit()
-    _migrate_existing_rows()
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_obs_region_epi ON {TABLE}(region, epiweek)")
+        # Covering index for the analytic /map aggregate: the scan reads only
+        # (metric, epiweek, region, value) from the index, never the table rows
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_obs_metric_epi_cover ON {TABLE}(metric, epiweek, region, value)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_obs_date ON {TABLE}(date)")
+        _migrate_existing_rows()
+        _INITIALIZED = True
+
+def reset_db_init():
+    """
+    Forget that the DB was initialized, so the next access re-runs `_ensure_db`.
+    Needed when DATA_PATH is repointed (e.g. per-test temporary databases);
+    also closes the shared connection and every thread's read connection.
+    """
+    global _INITIALIZED, _CONN, _CONN_PATH, _GENERATION
+    with _LOCK:
+        _INITIALIZED = False
+        if _CONN is not None:
+            _CONN.close()
+        _CONN, _CONN_PATH = None, None
+        for conn in list(_READ_CONNS):
+            conn.close()
+        _READ_CONNS.clear()
+        _GENERATION += 1
 
 def _iso_monday_from_epiweek(epi: int) -> str:
     """
     Convert an epiweek integer (YYYYWW) to the ISO week Monday (YYYY-MM-DD).
     """
-    s = str(int(epi))
-    year, week = int(s[:4]), int(s[4:6])
+    year, week = divmod(int(epi), 100)
     return dt_date.fromisocalendar(year, week, 1).isoformat()
 
+def _iso_monday_or_none(epi):
+    """SQL function wrapper: ISO Monday for a valid epiweek, else NULL."""
+    try:
+        return _iso_monday_from_epiweek(epi)
+    except (TypeError, ValueError):
+        return None
+
 def _migrate_existing_rows():
     """
     Backfill 'epiweek' and correct 'date' for rows that predate the epiweek column.
 
     Strategy:
-      - Derive epiweek from the trailing part of 'source_id' ("state-YYYYWW")
+      - Derive epiweek from the part of 'source_id' after the dash ("state-YYYYWW")
       - Replace 'date' with the ISO Monday of that epiweek.
       - If parsing fails, leave the record untouched.
+
+    Done as a single UPDATE; the ISO Monday comes from the `iso_monday` SQL
+    function registered in `_conn()`, since SQLite has no ISO-week arithmetic.
     """
-    with sqlite3.connect(DATA_PATH) as conn:
-        cur = conn.cursor()
-        # Fill epiweek from source_id suffix if missing
-        cur.execute(f"SELECT source_id, epiweek, date FROM {TABLE} WHERE epiweek IS NULL OR epiweek = ''")
-        to_fix = cur.fetchall()
-        if to_fix:
-            for source_id in to_fix:
-                # source_id pattern: "<state>-<YYYYWW>"
-                try:
-                    epi = int(source_id.split("-")[-1])
-                    new_date = _iso_monday_from_epiweek(epi)
-                    cur.execute(
-                        f"UPDATE {TABLE} SET epiweek=?, date=? WHERE source_id=?",
-                        (epi, new_date, source_id),
-                    )
-                except Exception:
-                    # if parsing fails, leave as is
-                    pass
-            conn.commit()
-
-def save(df: pd.DataFrame) -> int:
+    with _LOCK:
+        conn = _conn()
+        epi = "CAST(substr(source_id, instr(source_id, '-') + 1) AS INTEGER)"
+        conn.execute(
+            f"""
+            UPDATE {TABLE} SET epiweek = {epi}, date = iso_monday({epi})
+            WHERE (epiweek IS NULL OR epiweek = '')
+              AND substr(source_id, instr(source_id, '-') + 1) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
+              AND iso_monday({epi}) IS NOT NULL
+            """
+        )
+
+def save(df: pd.DataFrame, return_count: bool = False) -> int:
     """
     Upsert the given dataframe into SQLite.
 
@@ -91,43 +213,58 @@ def save(df: pd.DataFrame) -> int:
     ----------
     df : pd.DataFrame
         Must contain columns: date, region, value, metric, source_id, epiweek.
+    return_count : bool
+        If True, measure the rows SQLite actually inserted or updated
+        (total_changes delta). Otherwise skip that bookkeeping.
 
     Returns
     -------
     int
-        Number of rows inserted or updated (SQLite total_changes delta).
+        SQLite's changed-row count when `return_count` is True, else `len(df)`.
     """
     _ensure_db()
     if df is None or df.empty:
         return 0
-    rows = [
-        (
-            pd.to_datetime(r["date"]).strftime("%Y-%m-%d"),
-            str(r["region"]),
-            float(r["value"]),
-            str(r["metric"]),
-            str(r["source_id"]),
-            int(r["epiweek"]) if "epiweek" in r and pd.notna(r["epiweek"]) else None,
-        )
-        for r in df.to_dict(orient="records")
-    ]
-    with sqlite3.connect(DATA_PATH) as conn:
-        before = conn.total_changes
-        # SQLite UPSERT (requires UNIQUE/PK on source_id)
-        conn.executemany(
-            f"""
-            INSERT INTO {TABLE} (date, region, value, metric, source_id, epiweek)
-            VALUES (?,?,?,?,?,?)
-            ON CONFLICT(source_id) DO UPDATE SET
-                date=excluded.date,
-                region=excluded.region,
-                value=excluded.value,
-                metric=excluded.metric,
-                epiweek=excluded.epiweek
-            """,
-            rows,
-        )
-        inserted_or_updated = conn.total_changes - before
+    # Coerce whole columns at once; sqlite3 needs plain Python ints/None for epiweek
+    epiweek = (
+        pd.to_numeric(df["epiweek"], errors="coerce").astype("Int64")
+        if "epiweek" in df.columns
+        else pd.Series(pd.NA, index=df.index, dtype="Int64")
+    )
+    d = df.assign(
+        date=pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d"),
+        region=df["region"].astype(str),
+        value=df["value"].astype(float),
+        metric=df["metric"].astype(str),
+        source_id=df["source_id"].astype(str),
+        epiweek=epiweek.astype(object).where(epiweek.notna(), None),
+    )
+    rows = d[COLUMNS].itertuples(index=False, name=None)
+    with _LOCK:
+        conn = _conn()
+        before = conn.total_changes if return_count else 0
+        # One explicit transaction for the whole batch
+        conn.execute("BEGIN")
+        try:
+            # SQLite UPSERT (requires UNIQUE/PK on source_id)
+            conn.executemany(
+                f"""
+                INSERT INTO {TABLE} (date, region, value, metric, source_id, epiweek)
+                VALUES (?,?,?,?,?,?)
+                ON CONFLICT(source_id) DO UPDATE SET
+                    date=excluded.date,
+                    region=excluded.region,
+                    value=excluded.value,
+                    metric=excluded.metric,
+                    epiweek=excluded.epiweek
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        inserted_or_updated = conn.total_changes - before if return_count else len(df)
     return inserted_or_updated
 
 def read_all() -> pd.DataFrame:
@@ -137,12 +274,168 @@ def read_all() -> pd.DataFrame:
     Returns
     -------
     pd.DataFrame
-        DataFrame with parsed dates. If the table is missing, returns an empty
-        DF with the expected columns.
+        DataFrame with `date` kept as the stored ISO "YYYY-MM-DD" text. If the
+        table is missing, returns an empty DF with the expected columns.
     """
     _ensure_db()
-    with sqlite3.connect(DATA_PATH) as conn:
-        try:
-            return pd.read_sql_query(f"SELECT * FROM {TABLE}", conn, parse_dates=["date"])
-        except Exception:
-            return pd.DataFrame(columns=["date","region","value","metric","source_id","epiweek"])
+    try:
+        return pd.read_sql_query(f"SELECT * FROM {TABLE}", _read_conn())
+    except Exception:
+        return pd.DataFrame(columns=COLUMNS)
+
+def _where(region: str | None = None, epi_min: int | None = None, epi_max: int | None = None) -> tuple[str, list]:
+    """
+    Build a parameterized WHERE clause (and its params) for the common filters.
+    Returns an empty clause when no filter is given.
+    """
+    clauses, params = [], []
+    if region:
+        clauses.append("region = ?"); params.append(region)
+    if epi_min is not None:
+        clauses.append("epiweek >= ?"); params.append(int(epi_min))
+    if epi_max is not None:
+        clauses.append("epiweek <= ?"); params.append(int(epi_max))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def read_filtered(
+    region: str | None = None,
+    epi_min: int | None = None,
+    epi_max: int | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    order_by: str | list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Read only the matching observations, letting SQLite apply the filters.
+
+    Parameters
+    ----------
+    region : str | None
+        Exact region code as stored (uppercase USPS code).
+    epi_min, epi_max : int | None
+        Inclusive epiweek bounds (YYYYWW).
+    limit, offset : int | None
+        Optional pagination, applied after ordering.
+    order_by : str | list[str] | None
+        Column name(s) to sort by; must be columns of the observations table.
+
+    Returns
+    -------
+    pd.DataFrame
+        Same shape as `read_all()`, restricted to the matching rows.
+    """
+    _ensure_db()
+    where, params = _where(region, epi_min, epi_max)
+    sql = f"SELECT {', '.join(COLUMNS)} FROM {TABLE}{where}"
+    if order_by:
+        cols = [order_by] if isinstance(order_by, str) else list(order_by)
+        bad = [c for c in cols if c not in COLUMNS]
+        if bad:
+            raise ValueError(f"Cannot order by unknown column(s): {bad}")
+        sql += " ORDER BY " + ", ".join(cols)
+    if limit is not None:
+        sql += " LIMIT ?"; params.append(int(limit))
+        if offset:
+            sql += " OFFSET ?"; params.append(int(offset))
+    elif offset:
+        sql += " LIMIT -1 OFFSET ?"; params.append(int(offset))
+    return pd.read_sql_query(sql, _read_conn(), params=params)
+
+def read_page(
+    region: str | None = None,
+    epi_min: int | None = None,
+    epi_max: int | None = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> tuple[int, pd.DataFrame]:
+    """
+    One date-ordered page of matching observations plus the total match count.
+
+    Returns
+    -------
+    tuple[int, pd.DataFrame]
+        (rows matching the filters, up to `limit` rows starting at `offset`)
+    """
+    _ensure_db()
+    where, params = _where(region, epi_min, epi_max)
+    total = _read_conn().execute(f"SELECT COUNT(*) FROM {TABLE}{where}", params).fetchone()[0]
+    page = read_filtered(region, epi_min, epi_max, limit=limit, offset=offset, order_by="date")
+    return int(total), page
+
+def aggregate_mean_by_region(metric: str, epi_min: int, epi_max: int) -> dict[str, float]:
+    """
+    Mean value per region for one metric over an inclusive epiweek range,
+    aggregated inside SQLite.
+
+    Returns
+    -------
+    dict[str, float]
+        {region: mean value}; empty when nothing matches.
+    """
+    _ensure_db()
+    cur = _read_conn().execute(
+        f"""
+        SELECT region, AVG(value) FROM {TABLE}
+        WHERE metric = ? AND epiweek BETWEEN ? AND ?
+        GROUP BY region
+        """,
+        (metric, int(epi_min), int(epi_max)),
+    )
+    return dict(cur.fetchall())
+
+# (region, epiweek) walks idx_obs_region_epi in order; rowid is the index's
+# implicit last key, so it pins ties without forcing a sort
+_CSV_ORDER_BY = "region, epiweek, rowid"
+
+def iter_csv(
+    region: str | None = None,
+    epi_min: int | None = None,
+    epi_max: int | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[str]:
+    """
+    Return an iterator of the matching observations as CSV text, header first,
+    ordered by region then date. Rows are pulled from SQLite `chunk_size` at a
+    time so memory stays flat regardless of how many rows match.
+
+    The order comes straight from idx_obs_region_epi (see `_CSV_ORDER_BY`):
+    date is derived from epiweek, so sorting on (region, epiweek) needs no
+    temp B-tree and the first chunk is ready without sorting every row.
+
+    The query runs eagerly, so DB errors raise here rather than mid-stream.
+    Uses its own connection rather than the shared one: the cursor stays open
+    for as long as the client takes to download, and under WAL this reader
+    doesn't block `save()`. The connection allows cross-thread use because a
+    streaming response advances the iterator from whichever threadpool worker
+    is free (calls are never concurrent).
+    """
+    _ensure_db()
+    where, params = _where(region, epi_min, epi_max)
+    conn = sqlite3.connect(DATA_PATH, check_same_thread=False)
+    try:
+        cur = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM {TABLE}{where} ORDER BY {_CSV_ORDER_BY}",
+            params,
+        )
+    except Exception:
+        conn.close()
+        raise
+    return _csv_chunks(conn, cur, chunk_size)
+
+def _csv_chunks(conn: sqlite3.Connection, cur: sqlite3.Cursor, chunk_size: int) -> Iterator[str]:
+    """Format an open cursor as CSV chunks, closing its connection when done."""
+    try:
+        buf = StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        yield buf.getvalue()
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(rows)
+            yield buf.getvalue()
+    finally:
+        conn.close()
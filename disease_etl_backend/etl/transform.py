@@ -10,15 +10,29 @@ Key decisions:
 - We keep `metric="ili"` (weighted ILI percentage) so the table can support future metrics.
 """
 
+import numpy as np
 import pandas as pd
-from datetime import date as dt_date
 
 COLUMNS = ["date", "region", "value", "metric", "source_id", "epiweek"]
 
-def _epiweek_to_date(epi: int) -> str:
-    s = str(int(epi))
-    year, week = int(s[:4]), int(s[4:6])
-    return pd.Timestamp(dt_date.fromisocalendar(year, week, 1)).strftime("%Y-%m-%d")
+def _week1_mondays(year: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 of the Monday starting ISO week 1 (the week holding Jan 4)."""
+    jan4 = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64) + 3
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+    return jan4 - (jan4 + 3) % 7
+
+def _iso_mondays(year: np.ndarray, week: np.ndarray) -> np.ndarray:
+    """
+    Vectorized date.fromisocalendar(year, week, 1) returning "YYYY-MM-DD" strings.
+    Raises ValueError for weeks outside the ISO year, like fromisocalendar.
+    """
+    start = _week1_mondays(year)
+    n_weeks = (_week1_mondays(year + 1) - start) // 7
+    bad = (week < 1) | (week > n_weeks)
+    if bad.any():
+        raise ValueError(f"Invalid epiweek(s): {(year * 100 + week)[bad][:5].tolist()}")
+    days = start + (week - 1) * 7
+    return np.datetime_as_string(days.astype("datetime64[D]"), unit="D")
 
 def transform(raw: list[dict]) -> pd.DataFrame:
     """
@@ -43,28 +57,32 @@ def transform(raw: list[dict]) -> pd.DataFrame:
     if not raw:
         return pd.DataFrame(columns=COLUMNS)
 
-    df = pd.DataFrame(raw)
+    arr = pd.DataFrame(raw)
 
-    # Normalize names/types
-    df = df.rename(columns={"wili": "value"})
-    df["region"] = df["region"].astype(str).str.upper()
-    df["metric"] = "ili"
+    # epiweek: be robust to bad/missing values; one mask drives every column
+    epi = pd.to_numeric(arr.get("epiweek"), errors="coerce").to_numpy(dtype=float)
+    mask = ~np.isnan(epi)
+    epi_i = epi[mask].astype(np.int64)
+    epi_s = epi_i.astype(str)
 
-    # epiweek: be robust to bad/missing values
-    df["epiweek"] = pd.to_numeric(df.get("epiweek"), errors="coerce").astype("Int64")
-    df = df.dropna(subset=["epiweek"]).copy()
-    df["epiweek"] = df["epiweek"].astype(int)
+    # Normalize names/types
+    region = np.char.upper(arr["region"].to_numpy()[mask].astype(str))
+    value = pd.to_numeric(arr["wili"], errors="coerce").to_numpy(dtype=float)[mask]
 
-    # date from epiweek (ISO Monday)
-    df["date"] = df["epiweek"].apply(_epiweek_to_date)
+    # date from epiweek (ISO Monday), split with integer ops
+    dates = _iso_mondays(epi_i // 100, epi_i % 100)
 
     # stable PK
-    df["source_id"] = df["region"].str.lower() + "-" + df["epiweek"].astype(str)
-
-    # numeric value
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-
-    return df[["date", "region", "value", "metric", "source_id", "epiweek"]]
+    source_id = np.char.add(np.char.add(np.char.lower(region), "-"), epi_s)
+
+    return pd.DataFrame({
+        "date": np.asarray(dates, dtype=object),
+        "region": region.astype(object),
+        "value": value,
+        "metric": "ili",
+        "source_id": source_id.astype(object),
+        "epiweek": epi_i,
+    }, columns=COLUMNS)
 
 
 def summary_stats(df: pd.DataFrame) -> dict:
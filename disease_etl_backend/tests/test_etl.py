@@ -6,7 +6,11 @@ Includes detailed logging for every test phase.
 import os
 import json
 import logging
+import gc
+import sqlite3
+import threading
 import tempfile
+from datetime import date as dt_date
 from typing import Any, Dict, List
 
 import pandas as pd
@@ -38,6 +42,7 @@ def temp_db(monkeypatch):
         tmp_path = os.path.join(td, "test.db")
         from pathlib import Path
         monkeypatch.setattr(load_mod, "DATA_PATH", Path(tmp_path))
+        load_mod.reset_db_init()
         logger.info(f"🧪 Using temporary database at {tmp_path}")
         yield
 
@@ -75,16 +80,28 @@ def test_transform_basic_row():
     logger.info("Basic transform produces normalized row correctly.")
 
 
+def test_transform_dates_across_year_boundary():
+    """Dates must match date.fromisocalendar(year, week, 1) around new year."""
+    logger.info("Running test_transform_dates_across_year_boundary...")
+    weeks = [201901, 202053, 202452, 202501]
+    df = transform([{"region": "ma", "epiweek": w, "wili": 1.0} for w in weeks])
+    expected = [dt_date.fromisocalendar(w // 100, w % 100, 1).isoformat() for w in weeks]
+    logger.debug(f"Transformed dates: {df['date'].tolist()}")
+    assert df["date"].tolist() == expected
+    logger.info("✅ ISO-week Mondays are correct at year boundaries.")
+
+
 def test_save_and_read_upsert():
     """Saving twice with same key should update (not duplicate) rows."""
     logger.info("Running test_save_and_read_upsert...")
     df1 = transform([{"region": "ma", "epiweek": 202501, "wili": 1.0}])
-    n1 = save(df1)
+    n1 = save(df1, return_count=True)
     logger.info(f"Inserted {n1} rows.")
 
     df2 = transform([{"region": "ma", "epiweek": 202501, "wili": 2.0}])
-    n2 = save(df2)
+    n2 = save(df2, return_count=True)
     logger.info(f"Upserted {n2} rows (should replace previous).")
+    assert n1 == 1 and n2 == 1
 
     out = read_all()
     logger.debug(f"DB contents after upsert: {out.to_dict(orient='records')}")
@@ -93,6 +110,103 @@ def test_save_and_read_upsert():
     logger.info("✅ Upsert works: only one row exists with updated value.")
 
 
+def test_read_all_sees_each_save():
+    """Rows from a later save() must be visible to the next read_all()."""
+    logger.info("Running test_read_all_sees_each_save...")
+    save(transform([{"region": "ma", "epiweek": 202501, "wili": 1.0}]))
+    assert read_all()["region"].tolist() == ["MA"]
+
+    save(transform([{"region": "ny", "epiweek": 202501, "wili": 2.0}]))
+    assert sorted(read_all()["region"].tolist()) == ["MA", "NY"]
+    logger.info("✅ read_all() reflects the latest save().")
+
+
+def test_migrate_legacy_rows():
+    """Rows from before the epiweek column get epiweek and ISO Monday backfilled."""
+    logger.info("Running test_migrate_legacy_rows...")
+    load_mod.DATA_PATH.parent.mkdir(exist_ok=True, parents=True)
+    with sqlite3.connect(load_mod.DATA_PATH) as conn:
+        conn.execute(
+            "CREATE TABLE observations (date TEXT, region TEXT, value REAL, metric TEXT, source_id TEXT PRIMARY KEY)"
+        )
+        conn.executemany(
+            "INSERT INTO observations VALUES (?,?,?,?,?)",
+            [("2025-01-03", "MA", 1.0, "ili", "ma-202501"),
+             ("2025-01-03", "NY", 2.0, "ili", "ny-bad")],
+        )
+
+    out = read_all().set_index("source_id")
+    logger.debug(f"Migrated rows: {out.to_dict(orient='index')}")
+    assert int(out.loc["ma-202501", "epiweek"]) == 202501
+    assert out.loc["ma-202501", "date"] == "2024-12-30"
+    assert pd.isna(out.loc["ny-bad", "epiweek"])
+    logger.info("✅ Legacy rows backfilled; unparseable rows left untouched.")
+
+
+def test_iter_csv_advanced_from_multiple_threads():
+    """StreamingResponse may call next() on different worker threads."""
+    logger.info("Running test_iter_csv_advanced_from_multiple_threads...")
+    save(transform([{"region": "ma", "epiweek": w, "wili": 1.0} for w in (202501, 202502, 202503)]))
+    chunks = load_mod.iter_csv(chunk_size=1)
+
+    out, errors = [], []
+    def step():
+        try:
+            out.extend(chunks)  # drains the rest, including the finally/close
+        except Exception as e:
+            errors.append(e)
+    out.append(next(chunks))  # header on this thread
+    t = threading.Thread(target=step)
+    t.start(); t.join()
+
+    logger.debug(f"CSV chunks: {out}")
+    assert not errors
+    assert out[0] == "date,region,value,metric,source_id,epiweek\n"
+    assert len(out) == 4
+    logger.info("✅ CSV iterator works across threads.")
+
+
+def test_read_connections_closed_when_threads_exit():
+    """Per-thread read connections must not outlive their worker threads."""
+    logger.info("Running test_read_connections_closed_when_threads_exit...")
+    save(transform([{"region": "ma", "epiweek": 202501, "wili": 1.0}]))
+    load_mod.reset_db_init()
+
+    def read():
+        assert len(load_mod.read_filtered("MA")) == 1
+    for _ in range(20):
+        t = threading.Thread(target=read)
+        t.start(); t.join()
+
+    gc.collect()
+    logger.debug(f"Open read connections: {len(load_mod._READ_CONNS)}")
+    assert len(load_mod._READ_CONNS) == 0
+    logger.info("✅ Read connections are closed with their threads.")
+
+
+def test_iter_csv_streams_in_index_order():
+    """CSV rows come out by region then week, straight off the index (no sort)."""
+    logger.info("Running test_iter_csv_streams_in_index_order...")
+    save(transform([
+        {"region": "ny", "epiweek": 202502, "wili": 4.0},
+        {"region": "ma", "epiweek": 202502, "wili": 2.0},
+        {"region": "ny", "epiweek": 202501, "wili": 3.0},
+        {"region": "ma", "epiweek": 202501, "wili": 1.0},
+    ]))
+    lines = "".join(load_mod.iter_csv()).splitlines()[1:]
+    assert [l.split(",")[4] for l in lines] == ["ma-202501", "ma-202502", "ny-202501", "ny-202502"]
+
+    with sqlite3.connect(load_mod.DATA_PATH) as conn:
+        for where, params in [("", []), (" WHERE region = ?", ["MA"]), (" WHERE epiweek >= ?", [202501])]:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM observations{where} ORDER BY {load_mod._CSV_ORDER_BY}",
+                params,
+            ).fetchall()
+            logger.debug(f"Plan for {where!r}: {plan}")
+            assert not any("TEMP B-TREE" in row[3] for row in plan)
+    logger.info("✅ CSV export order is served by the index.")
+
+
 def test_summary_stats():
     """summary_stats should compute correct min/max/count over a small frame."""
     logger.info("Running test_summary_stats...")
@@ -119,7 +233,7 @@ def test_ingest_error_message(monkeypatch):
                 return {"result": -1, "message": "rate limited"}
         return R()
 
-    monkeypatch.setattr(ingest_mod.requests, "get", fake_get)
+    monkeypatch.setattr(ingest_mod._session, "get", fake_get)
     with pytest.raises(RuntimeError):
         ingest_mod.fetch("ma", "202501-202505")
     logger.info("Ingest properly raises RuntimeError on API failure.")
@@ -145,25 +259,36 @@ def test_run_etl_endpoints(client, monkeypatch):
             return _sample_raw("ny", [202501, 202502], [2.0, 4.0])
         return []
 
-    monkeypatch.setattr(ingest_mod, "fetch", fake_fetch)
+    # app.py imports fetch/save by name, so patch them there
+    monkeypatch.setattr(backend_app, "fetch", fake_fetch)
     logger.info("🔧 Mocked fetch() to avoid network requests.")
 
+    saved_batches = []
+    def recording_save(df, **kwargs):
+        saved_batches.append(len(df))
+        return load_mod.save(df, **kwargs)
+    monkeypatch.setattr(backend_app, "save", recording_save)
+
     r = client.post("/etl/run", params={"region": "all", "start_date": "2025-01-01", "end_date": "2025-01-14"})
     logger.info(f"/etl/run response: {r.status_code} {r.json()}")
     assert r.status_code == 200
-    assert r.json()["rows_loaded"] == 150
+    assert r.json()["rows_loaded"] == 4
+    # MA and NY are upserted together in one batch
+    assert saved_batches == [4]
 
     stats = client.get("/stats", params={"region": "MA", "start_date": "2025-01-01", "end_date": "2025-01-31"}).json()
     logger.info(f"/stats output: {stats}")
-    assert stats["count"] == 3
+    assert stats["count"] == 2
 
     data = client.get("/data", params={"region": "MA", "start_date": "2025-01-01", "end_date": "2025-01-31"}).json()
     logger.info(f"/data output rows: {len(data['rows'])}")
-    assert len(data["rows"]) == 3
+    assert data["total"] == 2
+    assert len(data["rows"]) == 2
 
     mapr = client.get("/map", params={"start_date": "2025-01-01", "end_date": "2025-01-31"})
     logger.info(f"/map output: {mapr.json()}")
     assert mapr.status_code == 200
+    assert mapr.json() == {"MA": pytest.approx(2.0), "NY": pytest.approx(3.0)}
 
     csv = client.get("/download.csv", params={"start_date": "2025-01-01", "end_date": "2025-01-31"})
     logger.info(f"/download.csv headers: {csv.headers}")